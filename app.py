@@ -1,8 +1,23 @@
 from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask.cli import AppGroup
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+import calendar
+import gzip
+import hashlib
+import json
+import math
 import os
+import shutil
+import threading
+import time
+import click
 import requests
+try:
+    import brotli
+except ImportError:
+    brotli = None
 from config import config
 
 app = Flask(__name__)
@@ -19,11 +34,12 @@ class Transaction(db.Model):
     description = db.Column(db.String(200), nullable=False)
     amount = db.Column(db.Float, nullable=False)  # Stored in IDR
     transaction_type = db.Column(db.String(10), nullable=False)  # 'income' or 'expense'
-    date = db.Column(db.Date, nullable=False, default=datetime.utcnow)
+    date = db.Column(db.Date, nullable=False, default=datetime.utcnow, index=True)
     category = db.Column(db.String(50))
     original_currency = db.Column(db.String(3), default='IDR')  # Store original currency code
     original_amount = db.Column(db.Float)  # Store original amount before conversion
     exchange_rate = db.Column(db.Float)  # Store the exchange rate used
+    recurring_id = db.Column(db.Integer, db.ForeignKey('recurring_transaction.id'))  # Rule that generated this row
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def to_dict(self):
@@ -37,13 +53,186 @@ class Transaction(db.Model):
             'original_currency': self.original_currency or 'IDR',
             'original_amount': self.original_amount,
             'exchange_rate': self.exchange_rate,
+            'recurring_id': self.recurring_id,
+            'projected': False,
             'created_at': self.created_at.isoformat()
         }
 
+class RecurringTransaction(db.Model):
+    """Rule for a repeating transaction, materialized lazily into Transaction rows"""
+    id = db.Column(db.Integer, primary_key=True)
+    description = db.Column(db.String(200), nullable=False)
+    amount = db.Column(db.Float, nullable=False)  # In original currency
+    currency = db.Column(db.String(3), nullable=False, default='IDR')
+    transaction_type = db.Column(db.String(10), nullable=False)  # 'income' or 'expense'
+    category = db.Column(db.String(50))
+    frequency = db.Column(db.String(10), nullable=False)  # 'daily', 'weekly', 'monthly' or 'yearly'
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date)  # Inclusive, None repeats forever
+    next_date = db.Column(db.Date, nullable=False, index=True)  # First occurrence not yet materialized
+    active = db.Column(db.Boolean, nullable=False, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'description': self.description,
+            'amount': self.amount,
+            'currency': self.currency,
+            'transaction_type': self.transaction_type,
+            'category': self.category or '',
+            'frequency': self.frequency,
+            'start_date': self.start_date.isoformat(),
+            'end_date': self.end_date.isoformat() if self.end_date else None,
+            'next_date': self.next_date.isoformat(),
+            'active': self.active,
+            'created_at': self.created_at.isoformat()
+        }
+
+class Budget(db.Model):
+    """Monthly spending limit for a category (in IDR)"""
+    id = db.Column(db.Integer, primary_key=True)
+    category = db.Column(db.String(50), nullable=False, unique=True)
+    monthly_limit = db.Column(db.Float, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'category': self.category,
+            'monthly_limit': self.monthly_limit,
+            'created_at': self.created_at.isoformat()
+        }
+
+class CategorySpending(db.Model):
+    """Running expense total per category and month, kept up to date on insert/delete"""
+    __table_args__ = (db.UniqueConstraint('category', 'month', name='uq_category_spending_category_month'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    category = db.Column(db.String(50), nullable=False)
+    month = db.Column(db.Date, nullable=False)  # First day of the month
+    total = db.Column(db.Float, nullable=False, default=0.0)
+
+class ExchangeRate(db.Model):
+    """Locally cached daily rate: 1 unit of currency = rate IDR"""
+    __table_args__ = (db.UniqueConstraint('currency', 'rate_date', name='uq_exchange_rate_currency_date'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    currency = db.Column(db.String(3), nullable=False)
+    rate_date = db.Column(db.Date, nullable=False)
+    rate = db.Column(db.Float, nullable=False)
+    fetched_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 # Currency Conversion Functions
+def _rate_cache_date(date):
+    """Latest and future-dated rates are cached under today's date"""
+    from datetime import date as date_class
+    today = date_class.today()
+    if date is None or date > today:
+        return today
+    return date
+
+def get_cached_idr_rate(currency, date=None):
+    """Return the cached IDR rate for currency on date, or None if not cached"""
+    if currency == 'IDR':
+        return 1.0
+    cached = ExchangeRate.query.filter_by(currency=currency, rate_date=_rate_cache_date(date)).first()
+    return cached.rate if cached else None
+
+def _dialect_insert():
+    """INSERT construct supporting ON CONFLICT for the configured database"""
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+def store_cached_rates(date, rates):
+    """
+    Save a day's IDR rates to the local cache, keeping rows already cached.
+    Uses its own connection, so the caller's session is never committed or
+    rolled back.
+    """
+    rate_date = _rate_cache_date(date)
+    rows = [
+        {'currency': currency, 'rate_date': rate_date, 'rate': rate, 'fetched_at': datetime.utcnow()}
+        for currency, rate in rates.items()
+        if currency != 'IDR' and len(currency) == 3
+    ]
+    if not rows:
+        return
+    stmt = _dialect_insert()(ExchangeRate).values(rows).on_conflict_do_nothing(
+        index_elements=['currency', 'rate_date']
+    )
+    with db.engine.begin() as conn:
+        conn.execute(stmt)
+
 def get_exchange_rate(from_currency, to_currency='IDR', date=None):
     """
-    Get exchange rate from a free API
+    Get exchange rate, served from the local rate cache when possible.
+    On a miss the whole rate table for that day is fetched and cached.
+    """
+    from_rate = get_cached_idr_rate(from_currency, date)
+    to_rate = get_cached_idr_rate(to_currency, date)
+    if from_rate is not None and to_rate is not None:
+        return from_rate / to_rate
+
+    try:
+        table = fetch_rate_table(date)
+    except ValueError as e:
+        # No table for that exact day; the lookup below may substitute the
+        # latest rate, so its result is used but never cached under `date`
+        print(f"Rate table unavailable: {e}")
+        return fetch_exchange_rate(from_currency, to_currency, date)
+
+    store_cached_rates(date, table)
+    table['IDR'] = 1.0
+    if from_currency in table and to_currency in table:
+        return table[from_currency] / table[to_currency]
+    return fetch_exchange_rate(from_currency, to_currency, date)
+
+def fetch_rate_table(date=None):
+    """
+    Fetch one day's rates for every currency as {currency: rate}, where
+    1 unit of currency = rate IDR. Unlike fetch_exchange_rate this never
+    substitutes the latest rates for a historical day: it raises ValueError
+    if that day's table is unavailable.
+    """
+    from datetime import date as date_class
+    if date and date >= date_class.today():
+        date = None
+    day = date.strftime('%Y-%m-%d') if date else None
+
+    if day:
+        sources = [
+            (f'https://api.exchangerate-api.com/v4/historical/IDR/{day}', None),
+            (f'https://api.exchangerate.host/{day}', {'base': 'IDR'}),
+        ]
+    else:
+        sources = [
+            ('https://api.exchangerate-api.com/v4/latest/IDR', None),
+            ('https://api.exchangerate.host/latest', {'base': 'IDR'}),
+        ]
+
+    errors = []
+    for url, params in sources:
+        try:
+            response = requests.get(url, params=params, timeout=10)
+            response.raise_for_status()
+            data = response.json()
+            if not data.get('rates'):
+                raise ValueError("Invalid API response format")
+            if day and data.get('date') != day:
+                raise ValueError(f"API returned rates for {data.get('date')} instead of {day}")
+            # Rates are quoted per 1 IDR; invert to IDR per unit
+            return {currency: 1.0 / float(rate) for currency, rate in data['rates'].items() if rate}
+        except (requests.RequestException, ValueError) as e:
+            errors.append(str(e))
+    raise ValueError(f"Could not fetch rate table for {day or 'latest'}: {'; '.join(errors)}")
+
+def fetch_exchange_rate(from_currency, to_currency='IDR', date=None):
+    """
+    Fetch exchange rate from a free API
     Uses exchangerate-api.com (free tier, no API key required)
     For historical dates, uses alternative free API if primary fails
     """
@@ -175,6 +364,442 @@ def convert_to_idr(amount, from_currency, transaction_date=None):
         # Return a reasonable fallback or raise
         raise ValueError(f"Failed to convert {amount} {from_currency} to IDR: {e}")
 
+def get_report_rates(currency, dates, mode='historical'):
+    """
+    Return (rates, approximated, mode_used) for converting stored IDR amounts
+    into a reporting currency: rates is {date: rate} (1 unit of currency =
+    rate IDR), approximated lists the dates converted without their own rate.
+
+    'historical' reads every needed day from the local rate cache in a single
+    query; days without a cached rate use the closest earlier cached day (or
+    the earliest one available) and are reported as approximated. 'spot'
+    applies one current rate to all dates. Only an empty cache for the
+    currency falls back to a single network spot rate, reported as mode_used
+    'spot' with every date approximated.
+    """
+    dates = sorted(set(dates))
+    if currency == 'IDR' or not dates:
+        return {d: 1.0 for d in dates}, [], mode
+
+    cached = []
+    if mode == 'historical':
+        cached = (
+            db.session.query(ExchangeRate.rate_date, ExchangeRate.rate)
+            .filter(ExchangeRate.currency == currency,
+                    ExchangeRate.rate_date <= _rate_cache_date(dates[-1]))
+            .order_by(ExchangeRate.rate_date)
+            .all()
+        )
+        if not cached:
+            # Every cached rate is newer than the ledger: use the earliest one
+            earliest = (
+                db.session.query(ExchangeRate.rate_date, ExchangeRate.rate)
+                .filter(ExchangeRate.currency == currency)
+                .order_by(ExchangeRate.rate_date)
+                .first()
+            )
+            cached = [earliest] if earliest else []
+    if not cached:
+        spot = get_exchange_rate(currency, 'IDR')
+        approximated = dates if mode == 'historical' else []
+        return {d: spot for d in dates}, approximated, 'spot'
+
+    # Walk both sorted lists together, carrying the latest rate forward
+    rates = {}
+    approximated = []
+    i = 0
+    current = cached[0]
+    for d in dates:
+        target = _rate_cache_date(d)
+        while i < len(cached) and cached[i].rate_date <= target:
+            current = cached[i]
+            i += 1
+        rates[d] = current.rate
+        if current.rate_date != target:
+            approximated.append(d)
+    return rates, approximated, mode
+
+def _parse_currency_code(value):
+    """Return an upper-cased 3-letter currency code, or raise ValueError"""
+    if not isinstance(value, str) or len(value) != 3 or not value.isalpha():
+        raise ValueError(f"Invalid currency code: {value}")
+    return value.upper()
+
+def _report_currency_args():
+    """Parse ?currency= and ?rate= for reporting endpoints"""
+    currency = _parse_currency_code(request.args.get('currency', 'IDR'))
+    mode = request.args.get('rate', 'historical').lower()
+    if mode not in ('historical', 'spot'):
+        raise ValueError(f"Invalid rate mode: {mode} (use 'historical' or 'spot')")
+    return currency, mode
+
+# Exchange Rate Pre-warming
+def fetch_rate_tables(dates, workers=None):
+    """
+    Fetch and cache one rate table per day, in parallel.
+    Returns {date: table} for the days fetched; failures are logged and
+    left out.
+    """
+    from datetime import date as date_class
+    today = date_class.today()
+    dates = sorted(set(dates))
+    if not dates:
+        return {}
+
+    tables = {}
+    with ThreadPoolExecutor(max_workers=workers or app.config['RATE_WARM_WORKERS']) as pool:
+        # Today's table is fetched from the latest endpoint
+        futures = {
+            pool.submit(fetch_rate_table, None if d >= today else d): d
+            for d in dates
+        }
+        for future in as_completed(futures):
+            rate_date = futures[future]
+            try:
+                table = future.result()
+                store_cached_rates(rate_date, table)
+                tables[rate_date] = table
+            except Exception as e:
+                print(f"Could not fetch rates for {rate_date}: {e}")
+    return tables
+
+def warm_exchange_rates(currencies=None, days=None, workers=None):
+    """
+    Fetch IDR rates for the configured currencies ahead of time.
+    Covers today plus a historical window of `days`, fetching only days
+    where some currency is not cached yet. One rate table is fetched per
+    day, in parallel. Currencies the API does not return at all are logged
+    and skipped. A day counts as stored only when every remaining currency
+    was written; otherwise it counts as failed and is retried on the next
+    run. Returns (stored, failed) day counts.
+    """
+    from datetime import date as date_class
+    currencies = currencies or app.config['SUPPORTED_CURRENCIES']
+    days = app.config['RATE_BACKFILL_DAYS'] if days is None else days
+
+    today = date_class.today()
+    dates = [today - timedelta(days=n) for n in range(days + 1)]
+    currencies = [c for c in currencies if c != 'IDR']
+
+    cached = set(
+        db.session.query(ExchangeRate.currency, ExchangeRate.rate_date)
+        .filter(ExchangeRate.currency.in_(currencies), ExchangeRate.rate_date >= dates[-1])
+        .all()
+    )
+
+    stored = failed = 0
+    # Currencies never cached may be unknown to the API; check them against
+    # today's table before fetching the whole window for them
+    known = {currency for currency, _ in cached}
+    if any(c not in known for c in currencies):
+        latest = fetch_rate_tables([today], workers).get(today)
+        if latest is not None:
+            unsupported = [c for c in currencies if c not in known and c not in latest]
+            if unsupported:
+                print(f"Skipping currencies not returned by the rate API: {', '.join(unsupported)}")
+                currencies = [c for c in currencies if c not in unsupported]
+            today_missing = any((c, today) not in cached for c in currencies)
+            cached.update((c, today) for c in currencies if c in latest)
+            if today_missing and all(c in latest for c in currencies):
+                stored += 1
+
+    missing = [d for d in dates if any((c, d) not in cached for c in currencies)]
+    tables = fetch_rate_tables(missing, workers)
+    for rate_date in missing:
+        table = tables.get(rate_date)
+        absent = [c for c in currencies if table is None or c not in table]
+        if not absent:
+            stored += 1
+        else:
+            if table is not None:
+                print(f"Rates for {rate_date} are missing {', '.join(absent)}")
+            failed += 1
+    return stored, failed
+
+def _rate_prewarm_loop(interval):
+    while True:
+        with app.app_context():
+            try:
+                stored, failed = warm_exchange_rates()
+                print(f"Exchange rate pre-warm: {stored} days stored, {failed} failed")
+                # Catch up recurring rules whose rates requests only fetch a few days at a time
+                materialize_recurring(datetime.now().date())
+            except Exception as e:
+                print(f"Exchange rate pre-warm error: {e}")
+        time.sleep(interval)
+
+_rate_prewarmer = None
+_rate_prewarmer_lock = threading.Lock()
+
+def start_rate_prewarmer():
+    """Start the background thread that keeps the rate cache warm (once per process)"""
+    global _rate_prewarmer
+    with _rate_prewarmer_lock:
+        if _rate_prewarmer is None or not _rate_prewarmer.is_alive():
+            _rate_prewarmer = threading.Thread(
+                target=_rate_prewarm_loop,
+                args=(app.config['RATE_PREWARM_INTERVAL'],),
+                name='rate-prewarmer',
+                daemon=True
+            )
+            _rate_prewarmer.start()
+    return _rate_prewarmer
+
+@app.before_request
+def ensure_rate_prewarmer():
+    """
+    Start the scheduler with the first request, so it runs under `flask run`,
+    `python app.py` and WSGI servers alike, but not in the reloader's parent
+    process or in CLI commands.
+    """
+    if app.config['RATE_PREWARM_ENABLED'] and _rate_prewarmer is None:
+        start_rate_prewarmer()
+
+rates_cli = AppGroup('rates', help='Exchange rate cache commands.')
+
+@rates_cli.command('warm')
+@click.option('--days', type=int, default=None, help='Historical days to backfill.')
+@click.option('--workers', type=int, default=None, help='Parallel fetch workers.')
+@click.option('--currency', 'currencies', multiple=True, help='Currency to warm (repeatable).')
+def warm_rates_command(days, workers, currencies):
+    """Fetch and cache daily rates for the supported currencies."""
+    currencies = [c.upper() for c in currencies] or None
+    stored, failed = warm_exchange_rates(currencies, days, workers)
+    click.echo(f"Warmed exchange rates: {stored} days stored, {failed} days failed")
+
+app.cli.add_command(rates_cli)
+
+# Budget Tracking
+def _month_start(day):
+    return day.replace(day=1)
+
+def track_category_spending(transaction, sign=1):
+    """
+    Add (sign=1) or remove (sign=-1) an expense from its category's running
+    monthly total. Runs as an atomic upsert inside the caller's transaction.
+    """
+    if transaction.transaction_type != 'expense':
+        return
+    delta = sign * transaction.amount
+    stmt = _dialect_insert()(CategorySpending).values(
+        category=transaction.category or '',
+        month=_month_start(transaction.date),
+        total=delta
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['category', 'month'],
+        set_={'total': CategorySpending.total + delta}
+    )
+    db.session.execute(stmt)
+
+# Recurring Transactions
+TRANSACTION_TYPES = ('income', 'expense')
+RECURRING_FREQUENCIES = ('daily', 'weekly', 'monthly', 'yearly')
+
+def _next_occurrence(rule, current):
+    """Occurrence after `current`; monthly/yearly rules keep the start day, clamped to month length"""
+    if rule.frequency == 'daily':
+        return current + timedelta(days=1)
+    if rule.frequency == 'weekly':
+        return current + timedelta(weeks=1)
+    months = 1 if rule.frequency == 'monthly' else 12
+    year, month = divmod(current.month - 1 + months, 12)
+    year += current.year
+    month += 1
+    day = min(rule.start_date.day, calendar.monthrange(year, month)[1])
+    return current.replace(year=year, month=month, day=day)
+
+def _occurrences(rule, since, until):
+    """Occurrence dates of `rule` from `since` up to `until` and its end_date"""
+    occurrences = []
+    occurrence = since
+    while occurrence <= until and (rule.end_date is None or occurrence <= rule.end_date):
+        occurrences.append(occurrence)
+        occurrence = _next_occurrence(rule, occurrence)
+    return occurrences
+
+_rate_fetch_retry_at = 0.0
+
+def _resolve_idr_rates(needed, max_fetch_days=None):
+    """
+    Look up {(currency, date): IDR rate} for recurring occurrences.
+
+    Cached rates are read in one query. Days missing from the cache are
+    fetched with one rate table per day, in parallel, oldest first and at
+    most `max_fetch_days` of them (None for no limit). A day whose table is
+    unavailable uses the closest cached rate, as reports do. Pairs left out
+    of the result wait for a later call. After a failed fetch, limited
+    (request-time) lookups stay off the network for RATE_FETCH_RETRY_INTERVAL
+    seconds.
+    """
+    global _rate_fetch_retry_at
+    if not needed:
+        return {}
+
+    currencies = {currency for currency, _ in needed}
+    days = {_rate_cache_date(day) for _, day in needed}
+    cached = {
+        (row.currency, row.rate_date): row.rate
+        for row in db.session.query(ExchangeRate.currency, ExchangeRate.rate_date, ExchangeRate.rate)
+        .filter(ExchangeRate.currency.in_(currencies),
+                ExchangeRate.rate_date >= min(days),
+                ExchangeRate.rate_date <= max(days))
+    }
+
+    missing = sorted({_rate_cache_date(day) for currency, day in needed
+                      if (currency, _rate_cache_date(day)) not in cached})
+    failed = set()
+    if missing and (max_fetch_days is None or time.time() >= _rate_fetch_retry_at):
+        batch = missing if max_fetch_days is None else missing[:max_fetch_days]
+        tables = fetch_rate_tables(batch)
+        for day in batch:
+            table = tables.get(day)
+            if table is None:
+                failed.add(day)
+                continue
+            for currency in currencies:
+                if currency in table:
+                    cached[(currency, day)] = table[currency]
+        if failed and max_fetch_days is not None:
+            _rate_fetch_retry_at = time.time() + app.config['RATE_FETCH_RETRY_INTERVAL']
+
+    rates = {}
+    unavailable = {}
+    for currency, day in needed:
+        key = (currency, _rate_cache_date(day))
+        if key in cached:
+            rates[(currency, day)] = cached[key]
+        elif key[1] in failed:
+            unavailable.setdefault(currency, []).append(day)
+
+    # Days the API has no table for fall back to the closest cached rate
+    has_cache = {
+        currency for (currency,) in
+        db.session.query(ExchangeRate.currency).filter(ExchangeRate.currency.in_(unavailable)).distinct()
+    } if unavailable else set()
+    for currency, unavailable_days in unavailable.items():
+        if currency not in has_cache:
+            continue
+        closest, _, _ = get_report_rates(currency, unavailable_days)
+        for day in unavailable_days:
+            rates[(currency, day)] = closest[day]
+    return rates
+
+def materialize_recurring(until, max_fetch_days=None):
+    """
+    Create Transaction rows for every recurring occurrence up to `until`,
+    never past today (future occurrences are only projected, see
+    project_recurring). Rates are resolved before the rules are locked, so
+    the inserts, spending totals and next_date cursors all commit in one
+    transaction and occurrences are never generated twice.
+
+    `max_fetch_days` bounds how many uncached days of rates are fetched;
+    a rule stops at its first unresolved occurrence and continues on a later
+    call. Request handlers pass RECURRING_RATE_FETCH_DAYS; the pre-warm
+    thread catches up without a limit.
+    Returns the number of transactions created.
+    """
+    from datetime import date as date_class
+    until = min(until, date_class.today())
+    due = (
+        RecurringTransaction.query
+        .filter(RecurringTransaction.active.is_(True), RecurringTransaction.next_date <= until)
+        .all()
+    )
+    if not due:
+        return 0
+
+    # Rate lookups may hit the network, so they happen before any row is locked
+    rates = _resolve_idr_rates({
+        (rule.currency, day)
+        for rule in due if rule.currency != 'IDR'
+        for day in _occurrences(rule, rule.next_date, until)
+    }, max_fetch_days)
+
+    rules = (
+        RecurringTransaction.query
+        .filter(RecurringTransaction.active.is_(True), RecurringTransaction.next_date <= until)
+        .with_for_update(skip_locked=True)
+        .populate_existing()
+        .all()
+    )
+    created = 0
+    for rule in rules:
+        occurrence = rule.next_date
+        while occurrence <= until and (rule.end_date is None or occurrence <= rule.end_date):
+            rate = 1.0 if rule.currency == 'IDR' else rates.get((rule.currency, occurrence))
+            if rate is None:
+                # Leave the cursor here so the occurrence is retried next time
+                break
+            transaction = Transaction(
+                description=rule.description,
+                amount=rule.amount * rate,
+                transaction_type=rule.transaction_type,
+                date=occurrence,
+                category=rule.category or '',
+                original_currency=rule.currency,
+                original_amount=rule.amount,
+                exchange_rate=rate,
+                recurring_id=rule.id
+            )
+            db.session.add(transaction)
+            track_category_spending(transaction)
+            created += 1
+            occurrence = _next_occurrence(rule, occurrence)
+        rule.next_date = occurrence
+        if rule.end_date is not None and occurrence > rule.end_date:
+            rule.active = False
+    db.session.commit()
+    return created
+
+def project_recurring(start, end):
+    """
+    Future occurrences (after today) of active rules between `start` and
+    `end`, as transaction dicts that are never saved. Foreign-currency
+    amounts use today's rate.
+    """
+    from datetime import date as date_class
+    first = date_class.today() + timedelta(days=1)
+    if start and start > first:
+        first = start
+    if end < first:
+        return []
+
+    projections = []
+    rules = (
+        RecurringTransaction.query
+        .filter(RecurringTransaction.active.is_(True), RecurringTransaction.next_date <= end)
+        .all()
+    )
+    for rule in rules:
+        try:
+            rate = 1.0 if rule.currency == 'IDR' else get_exchange_rate(rule.currency, 'IDR')
+        except ValueError as e:
+            print(f"Could not project recurring transaction {rule.id}: {e}")
+            continue
+        for occurrence in _occurrences(rule, rule.next_date, end):
+            if occurrence < first:
+                continue
+            projections.append({
+                'id': None,
+                'description': rule.description,
+                'amount': rule.amount * rate,
+                'transaction_type': rule.transaction_type,
+                'date': occurrence.isoformat(),
+                'category': rule.category or '',
+                'original_currency': rule.currency,
+                'original_amount': rule.amount,
+                'exchange_rate': rate,
+                'recurring_id': rule.id,
+                'projected': True,
+                'created_at': None
+            })
+    return projections
+
+def _parse_date_arg(name, default=None):
+    value = request.args.get(name)
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else default
+
 # Routes
 @app.route('/')
 def index():
@@ -205,8 +830,41 @@ def get_exchange_rate_api():
 
 @app.route('/api/transactions', methods=['GET'])
 def get_transactions():
-    transactions = Transaction.query.order_by(Transaction.date.desc()).all()
-    return jsonify([t.to_dict() for t in transactions])
+    try:
+        currency, mode = _report_currency_args()
+        start = _parse_date_arg('start')
+        end = _parse_date_arg('end')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Due recurring occurrences are saved; later ones in the range are only projected
+    materialize_recurring(datetime.now().date(), app.config['RECURRING_RATE_FETCH_DAYS'])
+
+    query = Transaction.query
+    if start:
+        query = query.filter(Transaction.date >= start)
+    if end:
+        query = query.filter(Transaction.date <= end)
+    result = [t.to_dict() for t in query.order_by(Transaction.date.desc()).all()]
+    if end:
+        result.extend(project_recurring(start, end))
+        result.sort(key=lambda item: item['date'], reverse=True)
+    if currency == 'IDR':
+        return jsonify(result)
+
+    dates = [datetime.strptime(item['date'], '%Y-%m-%d').date() for item in result]
+    try:
+        rates, approximated, mode = get_report_rates(currency, dates, mode)
+    except Exception as e:
+        return jsonify({'error': f'Currency conversion failed: {str(e)}'}), 400
+
+    approximated = set(approximated)
+    for item, day in zip(result, dates):
+        item['converted_amount'] = item['amount'] / rates[day]
+        item['converted_currency'] = currency
+        item['converted_rate_mode'] = mode
+        item['rate_approximated'] = day in approximated
+    return jsonify(result)
 
 @app.route('/api/transactions', methods=['POST'])
 def add_transaction():
@@ -241,28 +899,304 @@ def add_transaction():
         exchange_rate=exchange_rate
     )
     db.session.add(transaction)
+    track_category_spending(transaction)
     db.session.commit()
     return jsonify(transaction.to_dict()), 201
 
 @app.route('/api/transactions/<int:transaction_id>', methods=['DELETE'])
 def delete_transaction(transaction_id):
     transaction = Transaction.query.get_or_404(transaction_id)
+    track_category_spending(transaction, sign=-1)
     db.session.delete(transaction)
     db.session.commit()
     return jsonify({'message': 'Transaction deleted successfully'}), 200
 
 @app.route('/api/summary', methods=['GET'])
 def get_summary():
-    transactions = Transaction.query.all()
-    total_income = sum(t.amount for t in transactions if t.transaction_type == 'income')
-    total_expense = sum(t.amount for t in transactions if t.transaction_type == 'expense')
+    try:
+        currency, mode = _report_currency_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    materialize_recurring(datetime.now().date(), app.config['RECURRING_RATE_FETCH_DAYS'])
+
+    # Totals per (date, type) are summed in the database, so conversion only
+    # touches one row per distinct day rather than every transaction
+    daily_totals = (
+        db.session.query(Transaction.date, Transaction.transaction_type, db.func.sum(Transaction.amount))
+        .group_by(Transaction.date, Transaction.transaction_type)
+        .all()
+    )
+
+    try:
+        rates, approximated, mode = get_report_rates(currency, [row[0] for row in daily_totals], mode)
+    except Exception as e:
+        return jsonify({'error': f'Currency conversion failed: {str(e)}'}), 400
+
+    totals = {'income': 0.0, 'expense': 0.0}
+    for day, transaction_type, amount in daily_totals:
+        if transaction_type in totals:
+            totals[transaction_type] += amount / rates[day]
+
+    total_income = totals['income']
+    total_expense = totals['expense']
     balance = total_income - total_expense
     return jsonify({
         'total_income': total_income,
         'total_expense': total_expense,
-        'balance': balance
+        'balance': balance,
+        'currency': currency,
+        'rate_mode': mode if currency != 'IDR' else None,
+        # Days converted with a neighbouring day's (or the spot) rate
+        'approximated_dates': [d.isoformat() for d in approximated]
     })
 
+@app.route('/api/recurring', methods=['GET'])
+def get_recurring():
+    rules = RecurringTransaction.query.order_by(RecurringTransaction.next_date).all()
+    return jsonify([r.to_dict() for r in rules])
+
+@app.route('/api/recurring', methods=['POST'])
+def add_recurring():
+    data = request.get_json(silent=True) or {}
+    
+    frequency = str(data.get('frequency', 'monthly')).lower()
+    if frequency not in RECURRING_FREQUENCIES:
+        return jsonify({
+            'error': f"Invalid frequency: {frequency} (use one of {', '.join(RECURRING_FREQUENCIES)})"
+        }), 400
+    
+    transaction_type = data.get('transaction_type')
+    if transaction_type not in TRANSACTION_TYPES:
+        return jsonify({
+            'error': f"Invalid transaction_type: {transaction_type} (use one of {', '.join(TRANSACTION_TYPES)})"
+        }), 400
+    
+    try:
+        description = data['description']
+        amount = float(data['amount'])
+        start_date = datetime.strptime(data['start_date'], '%Y-%m-%d').date()
+        end_date = datetime.strptime(data['end_date'], '%Y-%m-%d').date() if data.get('end_date') else None
+        currency = _parse_currency_code(data.get('currency', 'IDR'))
+    except KeyError as e:
+        return jsonify({'error': f'Missing field: {e.args[0]}'}), 400
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid recurring transaction: {str(e)}'}), 400
+    
+    if end_date and end_date < start_date:
+        return jsonify({'error': 'end_date must not be before start_date'}), 400
+    
+    # A rule whose currency cannot be converted would never materialize;
+    # this also caches today's rates for it
+    if currency != 'IDR':
+        try:
+            get_exchange_rate(currency, 'IDR')
+        except ValueError as e:
+            return jsonify({'error': f'Currency conversion failed: {str(e)}'}), 400
+    
+    rule = RecurringTransaction(
+        description=description,
+        amount=amount,
+        currency=currency,
+        transaction_type=transaction_type,
+        category=data.get('category', ''),
+        frequency=frequency,
+        start_date=start_date,
+        end_date=end_date,
+        next_date=start_date
+    )
+    db.session.add(rule)
+    db.session.commit()
+    return jsonify(rule.to_dict()), 201
+
+@app.route('/api/recurring/<int:rule_id>', methods=['DELETE'])
+def delete_recurring(rule_id):
+    """Stop a recurring rule; transactions it already created are kept"""
+    rule = RecurringTransaction.query.get_or_404(rule_id)
+    rule.active = False
+    db.session.commit()
+    return jsonify({'message': 'Recurring transaction stopped successfully'}), 200
+
+@app.route('/api/budgets', methods=['GET'])
+def get_budgets():
+    budgets = Budget.query.order_by(Budget.category).all()
+    return jsonify([b.to_dict() for b in budgets])
+
+@app.route('/api/budgets', methods=['POST'])
+def set_budget():
+    """Create or update the monthly limit for a category"""
+    data = request.get_json(silent=True) or {}
+    
+    category = data.get('category', '')
+    if not isinstance(category, str) or len(category) > 50:
+        return jsonify({'error': 'category must be a string of at most 50 characters'}), 400
+    
+    try:
+        monthly_limit = float(data['monthly_limit'])
+    except KeyError:
+        return jsonify({'error': 'Missing field: monthly_limit'}), 400
+    except (TypeError, ValueError):
+        return jsonify({'error': f"Invalid monthly_limit: {data['monthly_limit']}"}), 400
+    if not math.isfinite(monthly_limit) or monthly_limit < 0:
+        return jsonify({'error': 'monthly_limit must be a non-negative number'}), 400
+    
+    budget = Budget.query.filter_by(category=category).first()
+    created = budget is None
+    if created:
+        budget = Budget(category=category)
+        db.session.add(budget)
+    budget.monthly_limit = monthly_limit
+    db.session.commit()
+    return jsonify(budget.to_dict()), 201 if created else 200
+
+@app.route('/api/budgets/<int:budget_id>', methods=['DELETE'])
+def delete_budget(budget_id):
+    budget = Budget.query.get_or_404(budget_id)
+    db.session.delete(budget)
+    db.session.commit()
+    return jsonify({'message': 'Budget deleted successfully'}), 200
+
+@app.route('/api/budgets/status', methods=['GET'])
+def get_budget_status():
+    """Spending against each budget for ?month=YYYY-MM (default: current month)"""
+    today = datetime.now().date()
+    month_str = request.args.get('month')
+    try:
+        month = datetime.strptime(month_str, '%Y-%m').date() if month_str else _month_start(today)
+    except ValueError:
+        return jsonify({'error': f'Invalid month: {month_str} (use YYYY-MM)'}), 400
+
+    month_end = month.replace(day=calendar.monthrange(month.year, month.month)[1])
+    materialize_recurring(min(month_end, today), app.config['RECURRING_RATE_FETCH_DAYS'])
+
+    # Running totals are maintained on every insert/delete, so this reads one row per budget
+    rows = (
+        db.session.query(Budget, CategorySpending.total)
+        .outerjoin(CategorySpending, db.and_(
+            CategorySpending.category == Budget.category,
+            CategorySpending.month == month
+        ))
+        .order_by(Budget.category)
+        .all()
+    )
+    status = []
+    for budget, spent in rows:
+        spent = spent or 0.0
+        status.append({
+            'category': budget.category,
+            'monthly_limit': budget.monthly_limit,
+            'spent': spent,
+            'remaining': budget.monthly_limit - spent,
+            'percent_used': spent / budget.monthly_limit * 100 if budget.monthly_limit else None,
+            'over_budget': spent > budget.monthly_limit
+        })
+    return jsonify({'month': month.strftime('%Y-%m'), 'budgets': status})
+
+# Response Compression
+# Static files are streamed (direct_passthrough) and never pass through here;
+# compress them at the front proxy if needed
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/html'}
+
+@app.after_request
+def compress_response(response):
+    """Gzip/brotli-encode responses above COMPRESS_MIN_SIZE, per Accept-Encoding"""
+    if (response.direct_passthrough
+            or response.is_streamed
+            or not 200 <= response.status_code < 300
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+
+    encodings = ['br', 'gzip'] if brotli else ['gzip']
+    encoding = request.accept_encodings.best_match(encodings)
+    if encoding == 'br':
+        response.set_data(brotli.compress(data, quality=min(app.config['COMPRESS_LEVEL'], 11)))
+    elif encoding == 'gzip':
+        response.set_data(gzip.compress(data, compresslevel=app.config['COMPRESS_LEVEL']))
+    else:
+        return response
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+# Static Asset Fingerprinting
+_asset_manifest = None
+
+def _asset_manifest_path():
+    return os.path.join(app.static_folder, app.config['ASSETS_DIST_DIR'], 'manifest.json')
+
+def get_asset_manifest():
+    """Map of static filename -> fingerprinted filename, empty if not built"""
+    global _asset_manifest
+    if _asset_manifest is None:
+        try:
+            with open(_asset_manifest_path()) as f:
+                _asset_manifest = json.load(f)
+        except (OSError, ValueError):
+            _asset_manifest = {}
+    return _asset_manifest
+
+def build_assets():
+    """
+    Copy every static file to <dist>/<path>.<hash>.<ext> and write the
+    manifest used by url_for. Returns the manifest.
+    """
+    global _asset_manifest
+    dist_name = app.config['ASSETS_DIST_DIR']
+    dist_dir = os.path.join(app.static_folder, dist_name)
+    shutil.rmtree(dist_dir, ignore_errors=True)
+
+    manifest = {}
+    for root, dirs, files in os.walk(app.static_folder):
+        if root == app.static_folder:
+            dirs[:] = [d for d in dirs if d != dist_name]
+        for name in files:
+            source = os.path.join(root, name)
+            filename = os.path.relpath(source, app.static_folder).replace(os.sep, '/')
+            with open(source, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()[:12]
+            base, ext = os.path.splitext(filename)
+            hashed = f'{dist_name}/{base}.{digest}{ext}'
+            target = os.path.join(app.static_folder, *hashed.split('/'))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(source, target)
+            manifest[filename] = hashed
+
+    with open(_asset_manifest_path(), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    _asset_manifest = manifest
+    return manifest
+
+@app.url_defaults
+def fingerprint_static_url(endpoint, values):
+    """Make url_for('static', ...) emit the fingerprinted filename when built"""
+    if endpoint == 'static' and 'filename' in values:
+        values['filename'] = get_asset_manifest().get(values['filename'], values['filename'])
+
+@app.after_request
+def cache_fingerprinted_assets(response):
+    """Fingerprinted files never change, so browsers may cache them indefinitely"""
+    filename = (request.view_args or {}).get('filename', '')
+    if (request.endpoint == 'static' and response.status_code in (200, 304)
+            and filename.startswith(app.config['ASSETS_DIST_DIR'] + '/')):
+        response.headers['Cache-Control'] = f"public, max-age={app.config['ASSETS_MAX_AGE']}, immutable"
+    return response
+
+assets_cli = AppGroup('assets', help='Static asset commands.')
+
+@assets_cli.command('build')
+def build_assets_command():
+    """Write fingerprinted copies of the static files."""
+    manifest = build_assets()
+    for filename, hashed in sorted(manifest.items()):
+        click.echo(f"{filename} -> {hashed}")
+
+app.cli.add_command(assets_cli)
+
 # Initialize database
 def init_db():
     with app.app_context():
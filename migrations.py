@@ -0,0 +1,358 @@
+"""
+Versioned Schema Migrations
+Applies schema changes online: DDL runs with a short lock timeout, indexes
+are built CONCURRENTLY on PostgreSQL, and data backfills run in throttled
+primary-key chunks that checkpoint their progress so an interrupted run
+resumes where it stopped.
+
+Applied versions are recorded in the schema_migrations table.
+"""
+import time
+from datetime import date, datetime
+from sqlalchemy import inspect, text
+from app import app, db
+
+# How long DDL may wait for a table lock before giving up and retrying
+DDL_LOCK_TIMEOUT = '5s'
+DDL_RETRIES = 5
+
+def _is_postgresql():
+    return db.engine.dialect.name == 'postgresql'
+
+def _id_column():
+    """Auto-incrementing integer primary key for the current database"""
+    return 'id SERIAL PRIMARY KEY' if _is_postgresql() else 'id INTEGER PRIMARY KEY'
+
+def ensure_migrations_table():
+    """Create the schema_migrations bookkeeping table if needed"""
+    with db.engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR(200) NOT NULL,
+                checkpoint BIGINT,
+                applied_at TIMESTAMP
+            )
+        """))
+
+def get_applied_versions():
+    with db.engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT version FROM schema_migrations WHERE applied_at IS NOT NULL"
+        ))
+        return {row[0] for row in rows}
+
+def _get_checkpoint(version):
+    with db.engine.connect() as conn:
+        return conn.execute(
+            text("SELECT checkpoint FROM schema_migrations WHERE version = :v"),
+            {'v': version}
+        ).scalar()
+
+def _start_migration(version, name):
+    with db.engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM schema_migrations WHERE version = :v"), {'v': version}
+        ).first()
+        if not exists:
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, name) VALUES (:v, :n)"),
+                {'v': version, 'n': name}
+            )
+
+def _finish_migration(version):
+    with db.engine.begin() as conn:
+        conn.execute(
+            text("UPDATE schema_migrations SET applied_at = :now WHERE version = :v"),
+            {'now': datetime.utcnow(), 'v': version}
+        )
+
+# Migration building blocks
+def run_ddl(sql):
+    """
+    Run a DDL statement without stalling traffic behind it.
+    On PostgreSQL a short lock_timeout makes the statement fail fast instead
+    of queueing (and blocking every later query) behind a long transaction;
+    it is then retried with backoff.
+    """
+    for attempt in range(1, DDL_RETRIES + 1):
+        try:
+            with db.engine.begin() as conn:
+                if _is_postgresql():
+                    conn.execute(text(f"SET LOCAL lock_timeout = '{DDL_LOCK_TIMEOUT}'"))
+                conn.execute(text(sql))
+            return
+        except Exception as e:
+            if 'lock timeout' not in str(e).lower() or attempt == DDL_RETRIES:
+                raise
+            print(f"  Lock not available, retrying ({attempt}/{DDL_RETRIES})...")
+            time.sleep(2 ** attempt)
+
+def create_index(name, table, columns):
+    """Create an index, using CREATE INDEX CONCURRENTLY on PostgreSQL"""
+    if not _is_postgresql():
+        run_ddl(f'CREATE INDEX IF NOT EXISTS {name} ON "{table}" ({columns})')
+        return
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        # A failed concurrent build leaves an INVALID index behind; drop it first
+        invalid = conn.execute(text("""
+            SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = :name AND NOT i.indisvalid
+        """), {'name': name}).first()
+        if invalid:
+            conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS {name}'))
+        conn.execute(text(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON "{table}" ({columns})'))
+
+def backfill_in_chunks(version, table, set_clause, where_clause):
+    """
+    Apply `UPDATE table SET set_clause WHERE where_clause` one primary-key
+    range at a time. Each chunk commits on its own, the last finished id is
+    checkpointed, and the loop sleeps between chunks to limit load.
+    """
+    chunk_size = app.config['MIGRATION_CHUNK_SIZE']
+    chunk_sleep = app.config['MIGRATION_CHUNK_SLEEP']
+
+    with db.engine.connect() as conn:
+        max_id = conn.execute(text(f'SELECT MAX(id) FROM "{table}"')).scalar() or 0
+
+    last_id = _get_checkpoint(version) or 0
+    if last_id:
+        print(f"  Resuming from id {last_id}")
+
+    total = 0
+    while last_id < max_id:
+        upper = min(last_id + chunk_size, max_id)
+        with db.engine.begin() as conn:
+            result = conn.execute(text(f"""
+                UPDATE "{table}" SET {set_clause}
+                WHERE id > :lower AND id <= :upper AND ({where_clause})
+            """), {'lower': last_id, 'upper': upper})
+            conn.execute(
+                text("UPDATE schema_migrations SET checkpoint = :c WHERE version = :v"),
+                {'c': upper, 'v': version}
+            )
+        total += result.rowcount
+        last_id = upper
+        print(f"  Backfilled ids up to {last_id}/{max_id} ({last_id * 100 // max_id}%), {total} rows updated")
+        if last_id < max_id and chunk_sleep:
+            time.sleep(chunk_sleep)
+    return total
+
+# Migrations
+def add_currency_columns(version):
+    """Add currency conversion columns to the transaction table"""
+    if_not_exists = 'IF NOT EXISTS ' if _is_postgresql() else ''
+    existing = {col['name'] for col in inspect(db.engine).get_columns('transaction')}
+    for col_name, col_type in [
+        ('original_currency', "VARCHAR(3) DEFAULT 'IDR'"),
+        ('original_amount', 'FLOAT'),
+        ('exchange_rate', 'FLOAT'),
+    ]:
+        if col_name in existing:
+            continue
+        print(f"  Adding column: {col_name}")
+        run_ddl(f'ALTER TABLE "transaction" ADD COLUMN {if_not_exists}{col_name} {col_type}')
+
+def backfill_currency_defaults(version):
+    """Fill currency fields on rows created before they existed"""
+    backfill_in_chunks(
+        version,
+        'transaction',
+        """original_currency = COALESCE(original_currency, 'IDR'),
+           original_amount = COALESCE(original_amount, amount),
+           exchange_rate = COALESCE(exchange_rate, 1.0)""",
+        'original_currency IS NULL OR original_amount IS NULL OR exchange_rate IS NULL'
+    )
+
+# Table DDL is written out as it stood at each version rather than taken
+# from the current models, so later model changes need their own migration.
+def create_exchange_rate_table(version):
+    """Create the local exchange rate cache table"""
+    run_ddl(f"""
+        CREATE TABLE IF NOT EXISTS exchange_rate (
+            {_id_column()},
+            currency VARCHAR(3) NOT NULL,
+            rate_date DATE NOT NULL,
+            rate FLOAT NOT NULL,
+            fetched_at TIMESTAMP,
+            CONSTRAINT uq_exchange_rate_currency_date UNIQUE (currency, rate_date)
+        )
+    """)
+
+def index_transaction_date(version):
+    """Index transaction.date for date-ordered listing"""
+    create_index('ix_transaction_date', 'transaction', 'date')
+
+def add_recurring_and_budgets(version):
+    """Create recurring rule and budget tables and link transactions to rules"""
+    run_ddl(f"""
+        CREATE TABLE IF NOT EXISTS recurring_transaction (
+            {_id_column()},
+            description VARCHAR(200) NOT NULL,
+            amount FLOAT NOT NULL,
+            currency VARCHAR(3) NOT NULL,
+            transaction_type VARCHAR(10) NOT NULL,
+            category VARCHAR(50),
+            frequency VARCHAR(10) NOT NULL,
+            start_date DATE NOT NULL,
+            end_date DATE,
+            next_date DATE NOT NULL,
+            active BOOLEAN NOT NULL,
+            created_at TIMESTAMP
+        )
+    """)
+    run_ddl('CREATE INDEX IF NOT EXISTS ix_recurring_transaction_next_date '
+            'ON recurring_transaction (next_date)')
+    run_ddl(f"""
+        CREATE TABLE IF NOT EXISTS budget (
+            {_id_column()},
+            category VARCHAR(50) NOT NULL UNIQUE,
+            monthly_limit FLOAT NOT NULL,
+            created_at TIMESTAMP
+        )
+    """)
+    run_ddl(f"""
+        CREATE TABLE IF NOT EXISTS category_spending (
+            {_id_column()},
+            category VARCHAR(50) NOT NULL,
+            month DATE NOT NULL,
+            total FLOAT NOT NULL,
+            CONSTRAINT uq_category_spending_category_month UNIQUE (category, month)
+        )
+    """)
+
+    # Each step checks its own state so a run interrupted between them resumes
+    existing = {col['name'] for col in inspect(db.engine).get_columns('transaction')}
+    if not _is_postgresql():
+        if 'recurring_id' not in existing:
+            print("  Adding column: recurring_id")
+            run_ddl('ALTER TABLE "transaction" ADD COLUMN recurring_id INTEGER REFERENCES recurring_transaction (id)')
+        return
+
+    if 'recurring_id' not in existing:
+        print("  Adding column: recurring_id")
+        run_ddl('ALTER TABLE "transaction" ADD COLUMN IF NOT EXISTS recurring_id INTEGER')
+    with db.engine.connect() as conn:
+        has_fkey = conn.execute(text(
+            "SELECT 1 FROM pg_constraint "
+            "WHERE conname = 'transaction_recurring_id_fkey' AND conrelid = '\"transaction\"'::regclass"
+        )).first()
+    if not has_fkey:
+        # NOT VALID skips scanning existing rows under an exclusive lock
+        print("  Adding constraint: transaction_recurring_id_fkey")
+        run_ddl('ALTER TABLE "transaction" ADD CONSTRAINT transaction_recurring_id_fkey '
+                'FOREIGN KEY (recurring_id) REFERENCES recurring_transaction (id) NOT VALID')
+    # Validation scans the table under SHARE UPDATE EXCLUSIVE, so reads and
+    # writes continue; it is a no-op once the constraint is valid
+    print("  Validating constraint: transaction_recurring_id_fkey")
+    run_ddl('ALTER TABLE "transaction" VALIDATE CONSTRAINT transaction_recurring_id_fkey')
+
+def _as_date(value):
+    # SQLite returns raw DATE columns as strings
+    return date.fromisoformat(value[:10]) if isinstance(value, str) else value
+
+def backfill_category_spending(version):
+    """
+    Seed running budget totals from existing expenses, one month per
+    transaction. While a month is recomputed, category_spending is locked
+    against the app's concurrent upserts (EXCLUSIVE lock on PostgreSQL, the
+    database write lock on SQLite), so no live update is lost or counted
+    twice. The lock is held only for that month's aggregate. Progress is
+    checkpointed as YYYYMM.
+    """
+    chunk_sleep = app.config['MIGRATION_CHUNK_SLEEP']
+
+    with db.engine.connect() as conn:
+        first, last = conn.execute(text(
+            "SELECT MIN(date), MAX(date) FROM \"transaction\" WHERE transaction_type = 'expense'"
+        )).first()
+    if first is None:
+        print("  No expenses to backfill")
+        return
+    month = _as_date(first).replace(day=1)
+    last = _as_date(last)
+
+    checkpoint = _get_checkpoint(version)
+    if checkpoint:
+        month = date(checkpoint // 100, checkpoint % 100, 1)
+        month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+        print(f"  Resuming from {month:%Y-%m}")
+
+    while month <= last:
+        next_month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+        with db.engine.begin() as conn:
+            if _is_postgresql():
+                conn.execute(text('LOCK TABLE category_spending IN EXCLUSIVE MODE'))
+            # On SQLite the DELETE takes the write lock before the totals are read
+            conn.execute(text('DELETE FROM category_spending WHERE month = :month'), {'month': month})
+            totals = conn.execute(text("""
+                SELECT COALESCE(category, ''), SUM(amount) FROM "transaction"
+                WHERE transaction_type = 'expense' AND date >= :start AND date < :end
+                GROUP BY COALESCE(category, '')
+            """), {'start': month, 'end': next_month}).all()
+            if totals:
+                conn.execute(
+                    text('INSERT INTO category_spending (category, month, total) VALUES (:category, :month, :total)'),
+                    [{'category': category, 'month': month, 'total': total} for category, total in totals]
+                )
+            conn.execute(
+                text("UPDATE schema_migrations SET checkpoint = :c WHERE version = :v"),
+                {'c': month.year * 100 + month.month, 'v': version}
+            )
+        print(f"  Backfilled {month:%Y-%m}: {len(totals)} categories")
+        month = next_month
+        if month <= last and chunk_sleep:
+            time.sleep(chunk_sleep)
+
+MIGRATIONS = [
+    (1, 'add currency columns', add_currency_columns),
+    (2, 'backfill currency defaults', backfill_currency_defaults),
+    (3, 'create exchange rate table', create_exchange_rate_table),
+    (4, 'index transaction date', index_transaction_date),
+    (5, 'add recurring transactions and budgets', add_recurring_and_budgets),
+    (6, 'backfill category spending', backfill_category_spending),
+]
+
+def upgrade():
+    """Apply all pending migrations in version order"""
+    with app.app_context():
+        ensure_migrations_table()
+        applied = get_applied_versions()
+        pending = [m for m in MIGRATIONS if m[0] not in applied]
+        if not pending:
+            print("[SUCCESS] Database schema is up to date")
+            return True
+
+        for version, name, migrate in pending:
+            print(f"\nApplying migration {version:03d}: {name}...")
+            try:
+                _start_migration(version, name)
+                migrate(version)
+                _finish_migration(version)
+                print(f"[SUCCESS] Applied migration {version:03d}")
+            except Exception as e:
+                print(f"[ERROR] Migration {version:03d} failed: {e}")
+                print("Fix the problem and re-run; completed work will not be repeated.")
+                return False
+        return True
+
+def stamp_all():
+    """Mark every migration as applied (for a freshly created schema)"""
+    with app.app_context():
+        ensure_migrations_table()
+        applied = get_applied_versions()
+        for version, name, _ in MIGRATIONS:
+            if version not in applied:
+                _start_migration(version, name)
+                _finish_migration(version)
+
+def status():
+    """Print the applied/pending state of every migration"""
+    with app.app_context():
+        ensure_migrations_table()
+        applied = get_applied_versions()
+        for version, name, _ in MIGRATIONS:
+            state = 'applied' if version in applied else 'pending'
+            print(f"  {version:03d} {name:<40} {state}")
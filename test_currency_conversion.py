@@ -3,7 +3,7 @@ Test Currency Conversion
 Tests the exchange rate API and conversion functionality
 """
 from app import app
-from app import get_exchange_rate, convert_to_idr
+from app import get_exchange_rate, convert_to_idr, warm_exchange_rates, get_cached_idr_rate
 from datetime import datetime
 
 def test_exchange_rates():
@@ -61,9 +61,49 @@ def test_historical_rates():
         except Exception as e:
             print(f"[ERROR] Historical rate test failed: {e}")
 
+def test_rate_prewarm():
+    """Test pre-warming the local exchange rate cache"""
+    print("\n" + "="*60)
+    print("Testing Exchange Rate Pre-warming")
+    print("="*60)
+    
+    from datetime import datetime, timedelta
+    test_date = datetime.now().date() - timedelta(days=2)
+    
+    with app.app_context():
+        try:
+            stored, failed = warm_exchange_rates(['USD', 'SGD'], days=2)
+            print(f"[SUCCESS] Warmed rates: {stored} stored, {failed} failed")
+            rate = get_cached_idr_rate('USD', test_date)
+            if rate is not None:
+                print(f"[SUCCESS] Cached rate (USD -> IDR on {test_date}): {rate:,.2f}")
+            else:
+                print(f"[ERROR] USD rate for {test_date} was not cached")
+        except Exception as e:
+            print(f"[ERROR] Rate pre-warm test failed: {e}")
+
+def test_report_currency():
+    """Test reporting totals in another currency"""
+    print("\n" + "="*60)
+    print("Testing Multi-currency Reporting")
+    print("="*60)
+    
+    client = app.test_client()
+    for currency in ['IDR', 'USD', 'SGD']:
+        for mode in ['historical', 'spot']:
+            response = client.get(f'/api/summary?currency={currency}&rate={mode}')
+            data = response.get_json()
+            if response.status_code == 200:
+                print(f"[SUCCESS] Summary in {currency} ({data['rate_mode'] or mode}): balance {data['balance']:,.2f}, "
+                      f"{len(data['approximated_dates'])} day(s) approximated")
+            else:
+                print(f"[ERROR] Summary in {currency} ({mode}): {data.get('error')}")
+
 if __name__ == '__main__':
     test_exchange_rates()
     test_historical_rates()
+    test_rate_prewarm()
+    test_report_currency()
     print("\n" + "="*60)
     print("Testing Complete!")
     print("="*60)
@@ -0,0 +1,82 @@
+"""
+Test HTTP Response Handling
+Tests response compression and fingerprinted static asset URLs
+"""
+import gzip
+import os
+import re
+import shutil
+import tempfile
+import app as app_module
+from app import app, build_assets
+
+def test_compression():
+    """Test gzip negotiation from Accept-Encoding"""
+    print("\n" + "="*60)
+    print("Testing Response Compression")
+    print("="*60)
+    
+    client = app.test_client()
+    min_size = app.config['COMPRESS_MIN_SIZE']
+    app.config['COMPRESS_MIN_SIZE'] = 0
+    try:
+        plain = client.get('/api/summary')
+        compressed = client.get('/api/summary', headers={'Accept-Encoding': 'gzip'})
+    finally:
+        app.config['COMPRESS_MIN_SIZE'] = min_size
+    
+    ok = (plain.headers.get('Content-Encoding') is None
+          and compressed.headers.get('Content-Encoding') == 'gzip'
+          and gzip.decompress(compressed.data) == plain.data
+          and 'Accept-Encoding' in compressed.headers.get('Vary', ''))
+    if ok:
+        print(f"[SUCCESS] gzip negotiated: {len(plain.data)} -> {len(compressed.data)} bytes")
+    else:
+        print(f"[ERROR] Unexpected encoding: {compressed.headers.get('Content-Encoding')}")
+    assert ok
+
+def test_fingerprinted_assets():
+    """Test url_for emitting hashed static names with long-lived caching"""
+    print("\n" + "="*60)
+    print("Testing Fingerprinted Static Assets")
+    print("="*60)
+    
+    client = app.test_client()
+    # Build into a copy of the static folder so an existing build is left alone
+    static_folder = app.static_folder
+    saved_manifest = app_module._asset_manifest
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        app.static_folder = os.path.join(tmp_dir, 'static')
+        shutil.copytree(static_folder, app.static_folder,
+                        ignore=shutil.ignore_patterns(app.config['ASSETS_DIST_DIR']))
+        manifest = build_assets()
+        html = client.get('/').get_data(as_text=True)
+        urls = re.findall(r'(?:href|src)="(/static/[^"]+)"', html)
+        expected = ['/static/' + manifest['css/style.css'], '/static/' + manifest['js/main.js']]
+        ok = all(url in urls for url in expected)
+        if ok:
+            print(f"[SUCCESS] Templates reference hashed files: {', '.join(expected)}")
+        else:
+            print(f"[ERROR] Templates reference: {urls}")
+        
+        response = client.get(expected[0])
+        cache_control = response.headers.get('Cache-Control', '')
+        response.close()
+        cached = 'immutable' in cache_control and 'max-age' in cache_control
+        if cached:
+            print(f"[SUCCESS] Hashed file Cache-Control: {cache_control}")
+        else:
+            print(f"[ERROR] Hashed file Cache-Control: {cache_control}")
+        assert ok and cached
+    finally:
+        app.static_folder = static_folder
+        app_module._asset_manifest = saved_manifest
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    test_compression()
+    test_fingerprinted_assets()
+    print("\n" + "="*60)
+    print("Testing Complete!")
+    print("="*60)
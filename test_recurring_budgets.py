@@ -0,0 +1,178 @@
+"""
+Test Recurring Transactions and Budgets
+Tests recurring rule materialization and incremental budget tracking
+"""
+from app import app, db, Transaction, RecurringTransaction, Budget, CategorySpending
+from app import _next_occurrence, materialize_recurring
+from datetime import date, datetime, timedelta
+
+TEST_CATEGORY = '__test_budget__'
+
+def check(label, ok, detail=''):
+    """Print a check result in the same format as the other test scripts"""
+    print(f"[{'SUCCESS' if ok else 'ERROR'}] {label}{': ' + detail if detail else ''}")
+    return ok
+
+def _add_rule(**fields):
+    rule = RecurringTransaction(
+        description='Test recurring',
+        amount=1000,
+        currency='IDR',
+        transaction_type='expense',
+        category=TEST_CATEGORY,
+        next_date=fields['start_date'],
+        **fields
+    )
+    db.session.add(rule)
+    db.session.commit()
+    return rule
+
+def _cleanup():
+    rule_ids = [r.id for r in RecurringTransaction.query.filter_by(category=TEST_CATEGORY)]
+    Transaction.query.filter(
+        db.or_(Transaction.category == TEST_CATEGORY, Transaction.recurring_id.in_(rule_ids))
+    ).delete(synchronize_session=False)
+    RecurringTransaction.query.filter_by(category=TEST_CATEGORY).delete()
+    Budget.query.filter_by(category=TEST_CATEGORY).delete()
+    CategorySpending.query.filter_by(category=TEST_CATEGORY).delete()
+    db.session.commit()
+
+def test_month_end_clamping():
+    """Test monthly rules keep their start day, clamped to short months"""
+    print("\n" + "="*60)
+    print("Testing Month-end Clamping")
+    print("="*60)
+
+    rule = RecurringTransaction(frequency='monthly', start_date=date(2024, 1, 31))
+    dates = [date(2024, 1, 31)]
+    for _ in range(2):
+        dates.append(_next_occurrence(rule, dates[-1]))
+
+    ok = check("Jan 31 -> Feb 29 -> Mar 31", dates == [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31)],
+               ' -> '.join(d.isoformat() for d in dates))
+    assert ok
+
+def test_materialization():
+    """Test recurring occurrences are saved once and end_date stops a rule"""
+    print("\n" + "="*60)
+    print("Testing Recurring Materialization")
+    print("="*60)
+
+    today = date.today()
+    results = []
+    with app.app_context():
+        _cleanup()
+        try:
+            rule = _add_rule(frequency='weekly', start_date=today - timedelta(weeks=3))
+            materialize_recurring(today)
+            first = Transaction.query.filter_by(recurring_id=rule.id).count()
+            materialize_recurring(today)
+            second = Transaction.query.filter_by(recurring_id=rule.id).count()
+            results.append(check("No duplicate materialization", first == second == 4,
+                                 f"{first} rows, then {second} rows"))
+
+            ended = _add_rule(frequency='weekly', start_date=today - timedelta(weeks=6),
+                              end_date=today - timedelta(weeks=4))
+            materialize_recurring(today)
+            db.session.refresh(ended)
+            count = Transaction.query.filter_by(recurring_id=ended.id).count()
+            results.append(check("end_date deactivates the rule", not ended.active and count == 3,
+                                 f"active={ended.active}, {count} rows"))
+
+            # Future occurrences are projected, never saved
+            client = app.test_client()
+            end = (today + timedelta(weeks=4)).isoformat()
+            items = client.get(f'/api/transactions?end={end}').get_json()
+            projected = [t for t in items if t['recurring_id'] == rule.id and t['projected']]
+            saved = Transaction.query.filter_by(recurring_id=rule.id).count()
+            results.append(check("Future occurrences are only projected", len(projected) == 4 and saved == 4,
+                                 f"{len(projected)} projected, {saved} saved"))
+        finally:
+            _cleanup()
+    assert all(results)
+
+def test_budget_tracking():
+    """Test budget totals follow added and deleted transactions"""
+    print("\n" + "="*60)
+    print("Testing Budget Tracking")
+    print("="*60)
+
+    today = datetime.now().date()
+    client = app.test_client()
+    results = []
+    with app.app_context():
+        _cleanup()
+        try:
+            created_status = client.post('/api/budgets', json={'category': TEST_CATEGORY, 'monthly_limit': 500}).status_code
+            updated_status = client.post('/api/budgets', json={'category': TEST_CATEGORY, 'monthly_limit': 1000}).status_code
+            results.append(check("Budget create/update status", (created_status, updated_status) == (201, 200),
+                                 f"{created_status} then {updated_status}"))
+
+            invalid = [
+                ('missing monthly_limit', {'category': TEST_CATEGORY}),
+                ('non-numeric monthly_limit', {'category': TEST_CATEGORY, 'monthly_limit': 'lots'}),
+                ('negative monthly_limit', {'category': TEST_CATEGORY, 'monthly_limit': -1}),
+            ]
+            for label, payload in invalid:
+                response = client.post('/api/budgets', json=payload)
+                results.append(check(f"Rejects {label}", response.status_code == 400,
+                                     response.get_json().get('error', '')))
+            response = client.post('/api/budgets', data='not json', content_type='text/plain')
+            results.append(check("Rejects non-JSON budget body", response.status_code == 400,
+                                 response.get_json().get('error', '')))
+
+            def spent():
+                status = client.get('/api/budgets/status').get_json()
+                return next(b['spent'] for b in status['budgets'] if b['category'] == TEST_CATEGORY)
+
+            created = client.post('/api/transactions', json={
+                'description': 'Test expense',
+                'amount': 300,
+                'currency': 'IDR',
+                'transaction_type': 'expense',
+                'category': TEST_CATEGORY,
+                'date': today.isoformat()
+            }).get_json()
+            after_add = spent()
+            client.delete(f"/api/transactions/{created['id']}")
+            after_delete = spent()
+            results.append(check("Budget totals after add and delete", after_add == 300 and after_delete == 0,
+                                 f"{after_add} after add, {after_delete} after delete"))
+        finally:
+            _cleanup()
+    assert all(results)
+
+def test_recurring_validation():
+    """Test invalid recurring rules are rejected"""
+    print("\n" + "="*60)
+    print("Testing Recurring Rule Validation")
+    print("="*60)
+
+    client = app.test_client()
+    base = {'description': 'Test', 'amount': 1, 'transaction_type': 'expense',
+            'category': TEST_CATEGORY, 'start_date': date.today().isoformat()}
+    cases = [
+        ('missing start_date', {k: v for k, v in base.items() if k != 'start_date'}),
+        ('invalid transaction_type', dict(base, transaction_type='transfer')),
+        ('invalid frequency', dict(base, frequency='hourly')),
+        ('currency longer than 3 letters', dict(base, currency='USDX')),
+        ('non-string currency', dict(base, currency=123)),
+        ('currency without a rate', dict(base, currency='ZZZ')),
+    ]
+    results = []
+    with app.app_context():
+        for label, payload in cases:
+            response = client.post('/api/recurring', json=payload)
+            results.append(check(f"Rejects {label}", response.status_code == 400,
+                                 response.get_json().get('error', '')))
+        _cleanup()
+    assert all(results)
+
+if __name__ == '__main__':
+    test_month_end_clamping()
+    test_materialization()
+    test_budget_tracking()
+    test_recurring_validation()
+    print("\n" + "="*60)
+    print("Testing Complete!")
+    print("="*60)